@@ -0,0 +1,21 @@
+"""How document text is split into the chunks we embed.
+
+Shared by day1.py and index_sweep.py so the benchmark indexes exactly what
+the app does, without importing the Streamlit app.
+"""
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+
+CHUNK_SIZE = 700
+CHUNK_OVERLAP = 100
+
+
+# Split text into the chunks we embed
+def split_into_chunks(text: str):
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        separators=["\n\n", "\n", " ", ""]
+    )
+    return splitter.split_text(text)
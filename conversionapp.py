@@ -1,51 +1,84 @@
 import streamlit as st
 from pathlib import Path
 import tempfile
-
-from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.backend.docling_parse_v2_backend import DoclingParseV2DocumentBackend
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions, AcceleratorOptions, AcceleratorDevice
-
-
-def convert_to_markdown(file_path: str) -> str:
-    path = Path(file_path)
-    ext = path.suffix.lower()
-
-    if ext == ".pdf":
-        pdf_opts = PdfPipelineOptions(do_ocr=False)
-        pdf_opts.accelerator_options = AcceleratorOptions(
-            num_threads=4,
-            device=AcceleratorDevice.CPU
-        )
-        converter = DocumentConverter(
-            format_options={
-                InputFormat.PDF: PdfFormatOption(
-                    pipeline_options=pdf_opts,
-                    backend=DoclingParseV2DocumentBackend
-                )
-            }
-        )
-        doc = converter.convert(file_path).document
-        return doc.export_to_markdown(image_mode="placeholder")
-
-    if ext in [".doc", ".docx"]:
-        converter = DocumentConverter()
-        doc = converter.convert(file_path).document
-        return doc.export_to_markdown(image_mode="placeholder")
-
-    if ext == ".txt":
+import zipfile
+import os
+
+from doc_convert import convert_bytes_to_markdown
+from temp_uploads import TEMP_PREFIX, sweep_orphaned_temp_files, temp_bytes_in_flight
+
+
+# Pick an output name that no other file in this batch has taken:
+# a.pdf -> a.md, then a.docx -> a_docx.md, a second a.docx -> a_docx_2.md
+def unique_output_name(upload_name: str, taken) -> str:
+    path = Path(upload_name)
+    candidate = f"{path.stem}.md"
+    if candidate not in taken:
+        return candidate
+    base = f"{path.stem}_{path.suffix.lstrip('.').lower()}"
+    candidate, n = f"{base}.md", 2
+    while candidate in taken:
+        candidate, n = f"{base}_{n}.md", n + 1
+    return candidate
+
+
+# Zip the already written markdown files into a temporary archive on disk.
+# ZipFile.write streams each file from disk in chunks while building it, but
+# st.download_button still loads the finished archive into memory to serve it.
+def build_zip_archive(folder: Path, names) -> str:
+    with tempfile.NamedTemporaryFile(delete=False, prefix=TEMP_PREFIX, suffix=".zip") as tmp:
+        archive_path = tmp.name
+    with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name in names:
+            path = folder / name
+            if path.is_file():
+                zf.write(path, arcname=name)
+    return archive_path
+
+
+def show_downloads():
+    folder = Path(st.session_state.output_folder)
+    names = [n for n in st.session_state.converted_files if (folder / n).is_file()]
+    if not names:
+        return
+
+    st.markdown("### Download Converted Files")
+
+    # Whole batch as one archive, built only when asked for
+    if st.button("Prepare zip of all files"):
+        archive_path = build_zip_archive(folder, names)
         try:
-            return path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            return path.read_text(encoding="latin-1", errors="replace")
+            with open(archive_path, "rb") as archive:
+                st.download_button(
+                    label=f"Download all ({len(names)} files, .zip)",
+                    data=archive,
+                    file_name=f"{folder.name or 'markdown'}.zip",
+                    mime="application/zip",
+                    key="dl_zip"
+                )
+        finally:
+            os.remove(archive_path)
 
-    raise ValueError(f"Unsupported extension: {ext}")
+    # Single file, read from disk only when asked for, like the archive
+    name = st.selectbox("Or pick a single file", names)
+    if name and st.button("Prepare selected file"):
+        with open(folder / name, "rb") as f:
+            st.download_button(
+                label=f"Download {name}",
+                data=f,
+                file_name=name,
+                mime="text/markdown",
+                key="dl_single"
+            )
 
 
 def main():
     st.title("Batch Document to Markdown")
 
+    # clear temp files left behind by crashed runs, then report live usage
+    sweep_orphaned_temp_files()
+    st.sidebar.metric("Temp upload bytes in flight", f"{temp_bytes_in_flight():,}")
+
     uploaded = st.file_uploader(
         "Choose files (PDF, DOC, DOCX, TXT)",
         type=["pdf", "doc", "docx", "txt"],
@@ -57,9 +90,10 @@ def main():
         value="output_markdown"
     )
 
-    # prepare session state for downloads
-    if "downloads" not in st.session_state:
-        st.session_state.downloads = []
+    # session state only remembers which files were written, never their text
+    if "converted_files" not in st.session_state:
+        st.session_state.converted_files = []
+        st.session_state.output_folder = dest
 
     if st.button("Start conversion"):
         if not uploaded:
@@ -67,10 +101,11 @@ def main():
             return
 
         # reset downloads list
-        st.session_state.downloads = []
+        st.session_state.converted_files = []
 
         out_folder = Path(dest)
         out_folder.mkdir(parents=True, exist_ok=True)
+        st.session_state.output_folder = str(out_folder)
 
         progress = st.progress(0)
         status = st.empty()
@@ -80,17 +115,14 @@ def main():
         for idx, up in enumerate(uploaded, start=1):
             name = up.name
             status.text(f"Converting {name} ({idx}/{total})")
-            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(name).suffix) as tmp:
-                tmp.write(up.getvalue())
-                tmp_path = tmp.name
 
             try:
-                md = convert_to_markdown(tmp_path)
-                out_file = out_folder / f"{Path(name).stem}.md"
+                md, _ = convert_bytes_to_markdown(name, up.getvalue())
+                out_file = out_folder / unique_output_name(name, st.session_state.converted_files)
                 out_file.write_text(md, encoding="utf-8", errors="replace")
 
-                # store for download
-                st.session_state.downloads.append((out_file.name, md))
+                # remember the file name; the text stays on disk
+                st.session_state.converted_files.append(out_file.name)
 
             except Exception as e:
                 st.warning(f"Failed: {name}: {e}")
@@ -101,16 +133,7 @@ def main():
         st.success(f"Saved markdown files to {out_folder.resolve()}")
 
     # show download buttons after conversion
-    if st.session_state.downloads:
-        st.markdown("### Download Converted Files")
-        for name, md in st.session_state.downloads:
-            st.download_button(
-                label=f"Download {name}",
-                data=md,
-                file_name=name,
-                mime="text/markdown",
-                key=f"dl_{name}"
-            )
+    show_downloads()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,205 @@
+"""Headless batch conversion of a directory tree to markdown.
+
+Reuses convert_to_markdown from doc_convert.py, so results match the
+browser app; each worker process builds docling's converters once and reuses
+them. Each document is written to disk as soon as it is converted, outputs
+that are newer than their source are skipped (so an interrupted run can
+simply be restarted), and progress is appended to a JSON-lines log. A file
+that crashes its worker is logged as failed and the run carries on.
+
+Usage:
+    python convert_cli.py SOURCE_DIR DEST_DIR [--workers 2] [--threads 4] [--log FILE] [--force]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+
+from doc_convert import DEFAULT_NUM_THREADS, convert_to_markdown
+
+
+SUPPORTED_EXTENSIONS = {".pdf", ".doc", ".docx", ".txt"}
+
+
+# Every supported file below the source folder, in a stable order
+def find_sources(source_dir: Path):
+    return sorted(
+        p for p in source_dir.rglob("*")
+        if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS
+    )
+
+
+# Mirror the source tree under the destination folder, swapping the suffix for .md
+def output_path_for(source_dir: Path, dest_dir: Path, source: Path) -> Path:
+    return (dest_dir / source.relative_to(source_dir)).with_suffix(".md")
+
+
+# An output is up to date when it exists and is not older than its source
+def is_up_to_date(source: Path, target: Path) -> bool:
+    try:
+        return target.stat().st_mtime >= source.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+
+# Convert one file and write the result straight to disk (runs in a worker process)
+def convert_one(source: str, target: str, num_threads: int = DEFAULT_NUM_THREADS) -> dict:
+    started = time.perf_counter()
+    target_path = Path(target)
+    try:
+        md = convert_to_markdown(source, num_threads)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        # Write next to the target and rename, so a killed run never leaves a
+        # truncated file that looks up to date on resume.
+        partial = target_path.with_name(target_path.name + ".partial")
+        partial.write_text(md, encoding="utf-8", errors="replace")
+        os.replace(partial, target_path)
+        return {
+            "event": "converted",
+            "source": source,
+            "output": target,
+            "chars": len(md),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+    except Exception as e:
+        return {
+            "event": "failed",
+            "source": source,
+            "error": f"{type(e).__name__}: {e}",
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+def write_log(log_file, record: dict):
+    record = {"time": datetime.now().isoformat(timespec="seconds"), **record}
+    log_file.write(json.dumps(record) + "\n")
+    log_file.flush()
+
+
+# Run jobs in a process pool, passing each finished record to report.
+# Returns, in submission order, the jobs left unfinished because a worker
+# process died (segfault, OOM kill): a dead worker breaks the whole pool.
+def run_pool(jobs, workers: int, num_threads: int, report):
+    crashed = set()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for source, target in jobs:
+            try:
+                futures.append(pool.submit(convert_one, source, target, num_threads))
+            except BrokenProcessPool:
+                break
+        for future in as_completed(futures):
+            try:
+                report(future.result())
+            except BrokenProcessPool:
+                crashed.add(future)
+    unfinished = [job for job, future in zip(jobs, futures) if future in crashed]
+    return unfinished + list(jobs[len(futures):])
+
+
+# Run every job, recovering from worker crashes. Workers take jobs in
+# submission order, so only the first `workers` unfinished jobs can have been
+# running when the pool broke. Those are retried alone, and reported as
+# failed if they crash again; the jobs that never started go back to a fresh
+# pool of the same size.
+def run_jobs(jobs, workers: int, num_threads: int, report):
+    while jobs:
+        crashed = run_pool(jobs, workers, num_threads, report)
+        suspects, jobs = crashed[:workers], crashed[workers:]
+        for source, target in suspects:
+            if run_pool([(source, target)], 1, num_threads, report):
+                report({"event": "failed", "source": source, "error": "worker process died"})
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a folder of documents to markdown.")
+    parser.add_argument("source", type=Path, help="folder to scan for PDF, DOC, DOCX and TXT files")
+    parser.add_argument("dest", type=Path, help="folder to write markdown files to")
+    parser.add_argument("--threads", type=int, default=DEFAULT_NUM_THREADS,
+                        help=f"docling threads per PDF conversion (default: {DEFAULT_NUM_THREADS})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of conversion processes (default: CPU count / threads)")
+    parser.add_argument("--log", type=Path, default=None,
+                        help="JSON-lines progress log (default: DEST/conversion_log.jsonl)")
+    parser.add_argument("--force", action="store_true",
+                        help="convert everything, even outputs that are up to date")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    args.threads = max(1, args.threads)
+    if args.workers is None:
+        args.workers = (os.cpu_count() or 1) // args.threads
+    args.workers = max(1, args.workers)
+    if not args.source.is_dir():
+        print(f"Source folder not found: {args.source}", file=sys.stderr)
+        return 2
+
+    args.dest.mkdir(parents=True, exist_ok=True)
+    log_path = args.log or args.dest / "conversion_log.jsonl"
+    counts = {"converted": 0, "skipped": 0, "failed": 0}
+    started = time.perf_counter()
+
+    with open(log_path, "a", encoding="utf-8") as log_file:
+        sources = find_sources(args.source)
+        write_log(log_file, {
+            "event": "start",
+            "source": str(args.source),
+            "dest": str(args.dest),
+            "files": len(sources),
+            "workers": args.workers,
+            "threads": args.threads,
+        })
+
+        pending = []
+        claimed = {}
+        for source in sources:
+            target = output_path_for(args.source, args.dest, source)
+            if target in claimed:
+                # e.g. notes.pdf and notes.docx in the same folder
+                counts["failed"] += 1
+                write_log(log_file, {
+                    "event": "failed",
+                    "source": str(source),
+                    "error": f"output {target} already produced by {claimed[target]}",
+                })
+                continue
+            claimed[target] = source
+            if not args.force and is_up_to_date(source, target):
+                counts["skipped"] += 1
+                write_log(log_file, {"event": "skipped", "source": str(source), "output": str(target)})
+                continue
+            pending.append((str(source), str(target)))
+
+        total = len(pending)
+        done = 0
+
+        def report(record):
+            nonlocal done
+            done += 1
+            counts[record["event"]] += 1
+            write_log(log_file, {**record, "done": done, "total": total})
+            print(f"[{done}/{total}] {record['event']}: {record['source']}")
+
+        run_jobs(pending, args.workers, args.threads, report)
+
+        write_log(log_file, {
+            "event": "done",
+            **counts,
+            "seconds": round(time.perf_counter() - started, 3),
+        })
+
+    print(f"Converted {counts['converted']}, skipped {counts['skipped']}, "
+          f"failed {counts['failed']}. Log: {log_path}")
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
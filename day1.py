@@ -18,14 +18,14 @@ def reset_database():
 import streamlit as st
 import chromadb
 from transformers import pipeline
-from pathlib import Path
-import tempfile
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+import time
 from sentence_transformers import SentenceTransformer
-from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.backend.docling_parse_v2_backend import DoclingParseV2DocumentBackend
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions, AcceleratorOptions, AcceleratorDevice
+from doc_convert import convert_bytes_to_markdown
+from chunking import split_into_chunks
+from temp_uploads import sweep_orphaned_temp_files, temp_bytes_in_flight
+from doc_store import DocumentStore
+from doc_index import DocumentIndex, SORT_KEYS
+from vector_index import IndexConfig
 
 
 from datetime import datetime
@@ -145,103 +145,148 @@ body, .stApp {
 """
 
 
-# Convert uploaded file to markdown text
-def convert_to_markdown(file_path: str) -> str:
-    path = Path(file_path)
-    ext = path.suffix.lower()
-
-    if ext == ".pdf":
-        pdf_opts = PdfPipelineOptions(do_ocr=False)
-        pdf_opts.accelerator_options = AcceleratorOptions(
-            num_threads=4,
-            device=AcceleratorDevice.CPU
-        )
-        converter = DocumentConverter(
-            format_options={
-                InputFormat.PDF: PdfFormatOption(
-                    pipeline_options=pdf_opts,
-                    backend=DoclingParseV2DocumentBackend
-                )
-            }
-        )
-        doc = converter.convert(file_path).document
-        return doc.export_to_markdown(image_mode="placeholder")
-
-    if ext in [".doc", ".docx"]:
-        converter = DocumentConverter()
-        doc = converter.convert(file_path).document
-        return doc.export_to_markdown(image_mode="placeholder")
-
-    if ext == ".txt":
-        try:
-            return path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            return path.read_text(encoding="latin-1", errors="replace")
-
-    raise ValueError(f"Unsupported extension: {ext}")
+# Vector index settings for new collections: HNSW space, M, ef_construction,
+# ef_search, and optional reduced dims / float16 vectors (see vector_index.py;
+# compare settings on your own notes with index_sweep.py)
+INDEX_CONFIG = IndexConfig(space="l2", M=16, ef_construction=100, ef_search=100)
 
 
 # Reset ChromaDB collection
-def reset_collection(client, collection_name: str):
+def reset_collection(client, collection_name: str, index_config: IndexConfig = None):
+    index_config = index_config or INDEX_CONFIG
     try:
         client.delete_collection(name=collection_name)
     except Exception:
         pass
-    return client.create_collection(name=collection_name)
+    collection = client.create_collection(name=collection_name, metadata=index_config.collection_metadata())
+    db = get_vector_db()
+    if client is db["client"]:
+        db["collections"][collection_name] = collection
+        db["index_configs"][collection_name] = IndexConfig.from_metadata(collection.metadata)
+    return collection
 
 
-# Add text chunks to ChromaDB
-def add_text_to_chromadb(text: str, filename: str, collection_name: str = "documents"):
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=700,
-        chunk_overlap=100,
-        separators=["\n\n", "\n", " ", ""]
-    )
-    chunks = splitter.split_text(text)
+# One ChromaDB client per process, shared by every session, with its open
+# collections and their index configs. Cached because Streamlit re-runs this
+# script in a fresh module on every interaction.
+@st.cache_resource
+def get_vector_db():
+    return {"client": chromadb.Client(), "collections": {}, "index_configs": {}}
+
 
-    if not hasattr(add_text_to_chromadb, 'client'):
-        add_text_to_chromadb.client = chromadb.Client()
-        add_text_to_chromadb.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        add_text_to_chromadb.collections = {}
+# The embedding model, loaded once per process
+@st.cache_resource
+def get_embedding_model():
+    return SentenceTransformer('all-MiniLM-L6-v2')
 
-    if collection_name not in add_text_to_chromadb.collections:
+
+# Shared collection by name. index_config only applies when it is first
+# created; the config actually used is always read back from the collection's
+# metadata, so documents and queries get the transform it was built with.
+def get_collection(collection_name: str = "documents", index_config: IndexConfig = None):
+    db = get_vector_db()
+    if collection_name not in db["collections"]:
+        index_config = index_config or INDEX_CONFIG
         try:
-            collection = add_text_to_chromadb.client.get_collection(name=collection_name)
+            collection = db["client"].get_collection(name=collection_name)
         except:
-            collection = add_text_to_chromadb.client.create_collection(name=collection_name)
-        add_text_to_chromadb.collections[collection_name] = collection
+            collection = db["client"].create_collection(
+                name=collection_name, metadata=index_config.collection_metadata())
+        db["collections"][collection_name] = collection
+        db["index_configs"][collection_name] = IndexConfig.from_metadata(collection.metadata)
+
+    return db["collections"][collection_name]
+
+
+# Embed texts the way a collection stores them (reduced dims / float16 per its config)
+def embed_texts(texts, collection_name: str = "documents"):
+    get_collection(collection_name)
+    embeddings = get_embedding_model().encode(list(texts))
+    return get_vector_db()["index_configs"][collection_name].transform(embeddings).tolist()
+
+
+# Process-wide document store: sessions keep handles, the text lives here once
+@st.cache_resource
+def get_document_store():
+    return DocumentStore()
+
+
+# Drop the chunks of documents no session references any more
+def drop_evicted_documents(collection_name: str = "documents"):
+    collection = get_collection(collection_name)
+    get_document_store().drain_evicted(
+        lambda content_hash: collection.delete(where={"content_hash": content_hash}))
+
 
-    collection = add_text_to_chromadb.collections[collection_name]
+# Add text chunks to ChromaDB (pass chunks if the text is already split)
+def add_text_to_chromadb(text: str, filename: str, collection_name: str = "documents", content_hash: str = None,
+                         chunks=None):
+    if chunks is None:
+        chunks = split_into_chunks(text)
 
-    for i, chunk in enumerate(chunks):
-        embedding = add_text_to_chromadb.embedding_model.encode(chunk).tolist()
+    collection = get_collection(collection_name)
+    # Chunks of stored documents are keyed by content, so sessions share them
+    id_prefix = content_hash or filename
+    embeddings = embed_texts(chunks, collection_name) if chunks else []
 
+    for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
         metadata = {
             "filename": filename,
             "chunk_index": i,
             "chunk_size": len(chunk)
         }
+        if content_hash:
+            metadata["content_hash"] = content_hash
 
         collection.add(
             embeddings=[embedding],
             documents=[chunk],
             metadatas=[metadata],
-            ids=[f"{filename}_chunk_{i}"]
+            ids=[f"{id_prefix}_chunk_{i}"]
         )
 
     return collection
 
 
 
+# Vector search with an optional metadata filter, pushed down into ChromaDB.
+# query_embedding comes from embed_texts([question], collection.name); only the
+# search itself is timed. Returns the query results and the time in milliseconds.
+def search_chunks(collection, query_embedding, where=None, n_results=3):
+    start = time.perf_counter()
+    results = collection.query(query_embeddings=query_embedding, n_results=n_results, where=where)
+    return results, (time.perf_counter() - start) * 1000
+
+
+# Build the ChromaDB filter for this session's documents, optionally narrowed
+# to some filenames, file types or upload dates. Returns None if nothing matches.
+def build_scope_filter(index, filenames=None, file_types=None, dates=None):
+    records = index.select(filenames, file_types, dates)
+    if not records:
+        return None
+    # Chunks are shared between sessions, so documents are matched by content
+    # hash rather than by the filename or file type the first uploader used
+    return {"content_hash": {"$in": sorted({r['handle'].content_hash for r in records})}}
+
+
 # Q&A function with source tracking
-def get_answer_with_source(collection, question):
-    results = collection.query(query_texts=[question], n_results=3)
+# where limits the search to chunk metadata (e.g. this session's documents);
+# source_names maps content hashes to the filenames this session uses;
+# pass query_embedding if the question is already embedded.
+# Returns (answer, source, search time in ms).
+def get_answer_with_source(collection, question, where=None, source_names=None, query_embedding=None):
+    if query_embedding is None:
+        query_embedding = embed_texts([question], collection.name)
+    results, search_ms = search_chunks(collection, query_embedding, where=where)
     docs = results["documents"][0]
     distances = results["distances"][0]
     ids = results["ids"][0] if "ids" in results else ["unknown"] * len(docs)
+    metadatas = results["metadatas"][0] if results.get("metadatas") else [{}] * len(docs)
 
-    if not docs or min(distances) > 1.5:
-        return "I don't have information about that topic in my documents.", "No source"
+    # the "no answer" cutoff depends on the collection's distance space
+    index_config = get_vector_db()["index_configs"].get(collection.name, INDEX_CONFIG)
+    if not docs or min(distances) > index_config.max_relevant_distance():
+        return "I don't have information about that topic in my documents.", "No source", search_ms
 
     context = "\n\n".join([f"Document {i+1}: {doc}" for i, doc in enumerate(docs)])
     prompt = f"""Context information:
@@ -258,7 +303,10 @@ Answer:"""
     answer = response[0]['generated_text'].strip()
     # Extract source from best matching document
     best_source = ids[0].split('_chunk_')[0] if ids else "unknown"
-    return answer, best_source
+    if metadatas and metadatas[0]:
+        best_source = metadatas[0].get("filename", best_source)
+        best_source = (source_names or {}).get(metadatas[0].get("content_hash"), best_source)
+    return answer, best_source, search_ms
 
 # Search history feature
 def add_to_search_history(question, answer, source):
@@ -285,42 +333,59 @@ def show_search_history():
             st.write("**Source:**", search['source'])
 
 # Document manager with delete and preview
+# Rows come from the metadata index, so only previewed documents are decompressed
 def show_document_manager():
     st.subheader("📋 Manage Documents")
-    if not st.session_state.get('converted_docs', []):
+    index = st.session_state.get('doc_index')
+    if not index:
         st.info("No documents uploaded yet.")
         return
-    for i, doc in enumerate(st.session_state.converted_docs):
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_by = st.selectbox("Sort by", list(SORT_KEYS), index=list(SORT_KEYS).index("Added"))
+    with col2:
+        descending = st.checkbox("Descending", value=False)
+    with col3:
+        page_size = st.selectbox("Per page", [10, 20, 50, 100], index=1)
+    num_pages = index.num_pages(page_size)
+    page = st.number_input("Page", min_value=1, max_value=num_pages, value=1, step=1) - 1
+    st.caption(f"Page {page + 1} of {num_pages} · {len(index)} documents")
+
+    for doc in index.page(sort_by, descending, page, page_size):
+        doc_id = doc['id']
         col1, col2, col3 = st.columns([3, 1, 1])
         with col1:
             st.write(f"📄 {doc['filename']}")
-            st.write(f"   Words: {len(doc['content'].split())}")
+            pages = f" · Pages: {doc['page_count']}" if doc['page_count'] else ""
+            st.write(f"   Words: {doc['word_count']:,} · Chunks: {doc['chunk_count']}{pages} · "
+                     f"{doc['size_bytes'] / 1024:,.1f} KB · Added {doc['ingested_at'].strftime('%d %b %H:%M')}")
         with col2:
-            if st.button("Preview", key=f"preview_{i}"):
-                st.session_state[f'show_preview_{i}'] = True
+            if st.button("Preview", key=f"preview_{doc_id}"):
+                st.session_state[f'show_preview_{doc_id}'] = True
         with col3:
-            if st.button("Delete", key=f"delete_{i}"):
-                st.session_state.converted_docs.pop(i)
-                # Rebuild database
-                st.session_state.collection = reset_collection(st.session_state.client, "documents")
-                for d in st.session_state.converted_docs:
-                    add_text_to_chromadb(d['content'], d['filename'], collection_name="documents")
+            if st.button("Delete", key=f"delete_{doc_id}"):
+                # Release our reference; chunks go once no session holds it
+                index.remove(doc_id)['handle'].release()
+                st.session_state.pop(f'show_preview_{doc_id}', None)
+                drop_evicted_documents()
                 st.rerun()
-        if st.session_state.get(f'show_preview_{i}', False):
+        if st.session_state.get(f'show_preview_{doc_id}', False):
             with st.expander(f"Preview: {doc['filename']}", expanded=True):
-                st.text(doc['content'][:500] + "..." if len(doc['content']) > 500 else doc['content'])
-                if st.button("Hide Preview", key=f"hide_{i}"):
-                    st.session_state[f'show_preview_{i}'] = False
+                content = doc['handle'].text
+                st.text(content[:500] + "..." if len(content) > 500 else content)
+                if st.button("Hide Preview", key=f"hide_{doc_id}"):
+                    st.session_state[f'show_preview_{doc_id}'] = False
                     st.rerun()
 
-# Document statistics
+# Document statistics, read from the running totals of the metadata index
 def show_document_stats():
     st.subheader("📊 Document Statistics")
-    if not st.session_state.get('converted_docs', []):
+    index = st.session_state.get('doc_index')
+    if not index:
         st.info("No documents to analyze.")
         return
-    total_docs = len(st.session_state.converted_docs)
-    total_words = sum(len(doc['content'].split()) for doc in st.session_state.converted_docs)
+    total_docs = len(index)
+    total_words = index.total_words
     avg_words = total_words // total_docs if total_docs > 0 else 0
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -329,36 +394,62 @@ def show_document_stats():
         st.metric("Total Words", f"{total_words:,}")
     with col3:
         st.metric("Average Words/Doc", f"{avg_words:,}")
-    file_types = {}
-    for doc in st.session_state.converted_docs:
-        ext = Path(doc['filename']).suffix.lower()
-        file_types[ext] = file_types.get(ext, 0) + 1
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Chunks", f"{index.total_chunks:,}")
+    with col2:
+        st.metric("Total Pages (PDF)", f"{index.total_pages:,}")
+    with col3:
+        st.metric("Total Upload Size", f"{index.total_bytes / 1024:,.1f} KB")
     st.write("**File Types:**")
-    for ext, count in file_types.items():
+    for ext, count in index.file_types.items():
         st.write(f"• {ext}: {count} files")
+    st.metric("Temp Upload Bytes In Flight", f"{temp_bytes_in_flight():,}")
+    store = get_document_store()
+    session_mem = store.session_report(index.handles())
+    total_mem = store.memory_report()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Your Share Of Stored Text", f"{session_mem['shared_bytes']:,} B")
+    with col2:
+        st.metric("Stored Text (All Users)", f"{total_mem['stored_bytes']:,} B")
+    with col3:
+        st.metric("Compression Ratio", f"{total_mem['compression_ratio']:.1f}x")
+    st.caption(f"{total_mem['documents']} unique documents shared by {total_mem['references']} uploads across sessions.")
 
 # Helper: convert uploaded files to markdown and store in session
 def convert_uploaded_files(uploaded_files):
     converted_docs = []
     for file in uploaded_files:
-        suffix = Path(file.name).suffix
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            temp_file.write(file.getvalue())
-            temp_file_path = temp_file.name
-        text = convert_to_markdown(temp_file_path)
+        data = file.getvalue()
+        text, pages = convert_bytes_to_markdown(file.name, data)
         converted_docs.append({
             'filename': file.name,
-            'content': text
+            'content': text,
+            'pages': pages,
+            'size_bytes': len(data)
         })
     return converted_docs
 
-# Helper: add docs to database
-def add_docs_to_database(collection, docs):
-    count = 0
+# Helper: add docs to the shared store and database, and record their
+# statistics in the session's metadata index. Content already stored by any
+# session is not embedded again. Returns the number of docs added.
+def add_docs_to_database(collection, docs, index):
+    store = get_document_store()
     for doc in docs:
-        add_text_to_chromadb(doc['content'], doc['filename'], collection_name="documents")
-        count += 1
-    return count
+        chunks = split_into_chunks(doc['content'])
+        handle = store.open(doc['filename'], doc['content'])
+        if handle.is_new:
+            add_text_to_chromadb(doc['content'], doc['filename'], collection_name="documents",
+                                 content_hash=handle.content_hash, chunks=chunks)
+        index.add(
+            handle,
+            word_count=len(doc['content'].split()),
+            chunk_count=len(chunks),
+            size_bytes=doc['size_bytes'],
+            page_count=doc['pages']
+        )
+    return len(docs)
 
 # --- Enhanced, holistic, user-friendly UI with tabs ---
 def create_tabbed_interface():
@@ -375,28 +466,45 @@ def create_tabbed_interface():
             if uploaded_files:
                 with st.spinner("Organizing your notes with love..."):
                     converted_docs = convert_uploaded_files(uploaded_files)
-                if 'converted_docs' not in st.session_state:
-                    st.session_state.converted_docs = []
-                if 'client' not in st.session_state:
-                    st.session_state.client = chromadb.Client()
+                if 'doc_index' not in st.session_state:
+                    st.session_state.doc_index = DocumentIndex()
                 if 'collection' not in st.session_state:
-                    st.session_state.collection = reset_collection(st.session_state.client, "documents")
-                num_added = add_docs_to_database(st.session_state.collection, converted_docs)
-                st.session_state.converted_docs.extend(converted_docs)
+                    st.session_state.collection = get_collection("documents")
+                num_added = add_docs_to_database(st.session_state.collection, converted_docs,
+                                                 st.session_state.doc_index)
                 st.success(f"🌸 Added {num_added} notes to your IMB Knowledge Base!")
             else:
                 st.info("Please select files to upload first.")
     with tab2:
         st.header("💖 Ask Anything About Your Notes")
-        if st.session_state.get('converted_docs', []):
+        if st.session_state.get('doc_index'):
             question, search_button, clear_button = enhanced_question_interface()
+            filenames, file_types, dates, compare = scope_filter_interface(st.session_state.doc_index)
             if search_button and question:
-                with st.spinner("Thinking and searching for you..."):
-                    answer, source = get_answer_with_source(st.session_state.collection, question)
-                st.markdown("### ✨ Your Personalized Answer")
-                st.write(answer)
-                st.info(f"📄 Source: {source}")
-                add_to_search_history(question, answer, source)
+                # only search the documents this session uploaded, narrowed by the scope
+                index = st.session_state.doc_index
+                where = build_scope_filter(index, filenames, file_types, dates)
+                source_names = {d.content_hash: d.filename for d in index.handles()}
+                if where is None:
+                    st.warning("No documents match the selected scope.")
+                else:
+                    collection = st.session_state.collection
+                    with st.spinner("Thinking and searching for you..."):
+                        query_embedding = embed_texts([question], collection.name)
+                        answer, source, search_ms = get_answer_with_source(
+                            collection, question, where=where, source_names=source_names,
+                            query_embedding=query_embedding)
+                    st.markdown("### ✨ Your Personalized Answer")
+                    st.write(answer)
+                    st.info(f"📄 Source: {source}")
+                    latency = f"⏱️ Search: {search_ms:.1f} ms"
+                    if compare:
+                        # timing only: an unfiltered search covers every session's chunks,
+                        # so its results are thrown away
+                        _, unfiltered_ms = search_chunks(collection, query_embedding, where=None)
+                        latency += f" with filter · {unfiltered_ms:.1f} ms without"
+                    st.caption(latency)
+                    add_to_search_history(question, answer, source)
             if clear_button:
                 st.session_state.search_history = []
                 st.success("Search history cleared!")
@@ -432,16 +540,33 @@ def enhanced_question_interface():
         clear_button = st.button("🗑️ Clear History")
     return question, search_button, clear_button
 
+# Pick which of your documents a question should search
+def scope_filter_interface(index):
+    with st.expander("🎯 Search within selected notes"):
+        records = list(index)
+        filenames = st.multiselect("Files", sorted({r['filename'] for r in records}))
+        file_types = st.multiselect("File types", sorted(index.file_types))
+        dates = st.multiselect(
+            "Upload dates",
+            sorted({r['ingested_at'].date() for r in records}, reverse=True),
+            format_func=lambda d: d.strftime("%d %b %Y")
+        )
+        compare = st.checkbox("Also time the search without a filter", value=False)
+    return filenames, file_types, dates, compare
+
 def main():
     add_custom_css()
+    # clear temp files left behind by crashed runs
+    sweep_orphaned_temp_files()
     st.markdown('<h1 class="main-header">🌸 Blanka\'s Personal IMB Knowledge Base 🌸</h1>', unsafe_allow_html=True)
     st.markdown("Upload your notes, organize your academic year, and ask anything! Your personal assistant is here for you 💖")
-    if 'converted_docs' not in st.session_state:
-        st.session_state.converted_docs = []
-    if 'client' not in st.session_state:
-        st.session_state.client = chromadb.Client()
+    if 'doc_index' not in st.session_state:
+        st.session_state.doc_index = DocumentIndex()
     if 'collection' not in st.session_state:
-        st.session_state.collection = reset_collection(st.session_state.client, "documents")
+        # shared across sessions, so never reset it here
+        st.session_state.collection = get_collection("documents")
+    # clean up chunks of documents whose last session has gone away
+    drop_evicted_documents()
     if 'search_history' not in st.session_state:
         st.session_state.search_history = []
     create_tabbed_interface()
@@ -0,0 +1,97 @@
+"""Document to markdown conversion shared by the apps and convert_cli.py.
+
+Uploads are converted from memory where docling can read a stream; other
+formats go through a scoped temp file (see temp_uploads.py).
+"""
+
+import threading
+from io import BytesIO
+from pathlib import Path
+
+from docling.document_converter import DocumentConverter, PdfFormatOption
+from docling.backend.docling_parse_v2_backend import DoclingParseV2DocumentBackend
+from docling.datamodel.base_models import InputFormat, DocumentStream
+from docling.datamodel.pipeline_options import PdfPipelineOptions, AcceleratorOptions, AcceleratorDevice
+
+from temp_uploads import scoped_temp_file
+
+
+# Formats docling can read straight from an in-memory stream
+STREAMABLE_EXTENSIONS = [".pdf", ".docx"]
+
+# Threads docling uses for one PDF conversion
+DEFAULT_NUM_THREADS = 4
+
+# Converters load docling's models, so each thread builds them once and reuses
+# them (one set per worker process in convert_cli.py)
+_local = threading.local()
+
+
+# Get the docling converter for a file type, building it on first use
+def build_converter(ext: str, num_threads: int = DEFAULT_NUM_THREADS) -> DocumentConverter:
+    key = ("pdf", num_threads) if ext == ".pdf" else ("default",)
+    cache = getattr(_local, "converters", None)
+    if cache is None:
+        cache = _local.converters = {}
+    if key not in cache:
+        cache[key] = _new_converter(ext, num_threads)
+    return cache[key]
+
+
+def _new_converter(ext: str, num_threads: int) -> DocumentConverter:
+    if ext == ".pdf":
+        pdf_opts = PdfPipelineOptions(do_ocr=False)
+        pdf_opts.accelerator_options = AcceleratorOptions(
+            num_threads=num_threads,
+            device=AcceleratorDevice.CPU
+        )
+        return DocumentConverter(
+            format_options={
+                InputFormat.PDF: PdfFormatOption(
+                    pipeline_options=pdf_opts,
+                    backend=DoclingParseV2DocumentBackend
+                )
+            }
+        )
+    return DocumentConverter()
+
+
+# Decode plain text, falling back to latin-1
+def decode_text(data: bytes) -> str:
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1", errors="replace")
+
+
+def convert_to_markdown(file_path: str, num_threads: int = DEFAULT_NUM_THREADS) -> str:
+    path = Path(file_path)
+    ext = path.suffix.lower()
+
+    if ext in [".pdf", ".doc", ".docx"]:
+        doc = build_converter(ext, num_threads).convert(file_path).document
+        return doc.export_to_markdown(image_mode="placeholder")
+
+    if ext == ".txt":
+        return decode_text(path.read_bytes())
+
+    raise ValueError(f"Unsupported extension: {ext}")
+
+
+# Convert upload bytes in memory where docling allows it, otherwise via a
+# temp file that is always removed afterwards.
+# Returns (markdown, page count); the page count is None when unknown.
+def convert_bytes_to_markdown(name: str, data: bytes):
+    ext = Path(name).suffix.lower()
+
+    if ext == ".txt":
+        return decode_text(data), None
+
+    if ext in STREAMABLE_EXTENSIONS:
+        stream = DocumentStream(name=name, stream=BytesIO(data))
+        doc = build_converter(ext).convert(stream).document
+        pages = doc.num_pages() if ext == ".pdf" else None
+        return doc.export_to_markdown(image_mode="placeholder"), pages
+
+    with scoped_temp_file(data, suffix=ext) as tmp_path:
+        return convert_to_markdown(tmp_path), None
@@ -0,0 +1,101 @@
+"""Per-session metadata index for ingested documents.
+
+Statistics (words, chunks, pages, size, file type, ingest time) are computed
+once when a document is added. Running totals are kept alongside, so the
+Stats tab never touches document text and the Manage tab can sort and page
+through large libraries without recounting anything.
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+
+SORT_KEYS = {
+    "Name": lambda r: r["filename"].lower(),
+    "Words": lambda r: r["word_count"],
+    "Chunks": lambda r: r["chunk_count"],
+    "Pages": lambda r: r["page_count"] or 0,
+    "Size": lambda r: r["size_bytes"],
+    "Added": lambda r: r["ingested_at"],
+}
+
+
+class DocumentIndex:
+    def __init__(self):
+        self._records = {}
+        self._next_id = 0
+        self._sorted = {}
+        self.total_words = 0
+        self.total_chunks = 0
+        self.total_pages = 0
+        self.total_bytes = 0
+        self.file_types = {}
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    # Record a document's statistics; handle is its doc_store.DocumentHandle
+    def add(self, handle, word_count: int, chunk_count: int, size_bytes: int, page_count=None) -> int:
+        doc_id = self._next_id
+        self._next_id += 1
+        record = {
+            "id": doc_id,
+            "handle": handle,
+            "filename": handle.filename,
+            "file_type": Path(handle.filename).suffix.lower(),
+            "word_count": word_count,
+            "chunk_count": chunk_count,
+            "page_count": page_count,
+            "size_bytes": size_bytes,
+            "ingested_at": datetime.now(),
+        }
+        self._records[doc_id] = record
+        self._update_totals(record, 1)
+        return doc_id
+
+    def remove(self, doc_id: int) -> dict:
+        record = self._records.pop(doc_id)
+        self._update_totals(record, -1)
+        return record
+
+    def get(self, doc_id: int) -> dict:
+        return self._records[doc_id]
+
+    def handles(self):
+        return [r["handle"] for r in self._records.values()]
+
+    # Records matching every given filter; an empty or None filter matches all
+    def select(self, filenames=None, file_types=None, dates=None):
+        return [
+            r for r in self._records.values()
+            if (not filenames or r["filename"] in filenames)
+            and (not file_types or r["file_type"] in file_types)
+            and (not dates or r["ingested_at"].date() in dates)
+        ]
+
+    def _update_totals(self, record, sign):
+        self.total_words += sign * record["word_count"]
+        self.total_chunks += sign * record["chunk_count"]
+        self.total_pages += sign * (record["page_count"] or 0)
+        self.total_bytes += sign * record["size_bytes"]
+        ext = record["file_type"]
+        self.file_types[ext] = self.file_types.get(ext, 0) + sign
+        if self.file_types[ext] <= 0:
+            del self.file_types[ext]
+        # any change invalidates the cached orderings
+        self._sorted = {}
+
+    # One page of records, ordered by a SORT_KEYS entry. The ordering is
+    # cached until the index changes.
+    def page(self, sort_by: str = "Added", descending: bool = False, page: int = 0, page_size: int = 20):
+        key = (sort_by, descending)
+        if key not in self._sorted:
+            self._sorted[key] = sorted(self._records.values(), key=SORT_KEYS[sort_by], reverse=descending)
+        start = page * page_size
+        return self._sorted[key][start:start + page_size]
+
+    def num_pages(self, page_size: int = 20) -> int:
+        return max(1, -(-len(self._records) // page_size))
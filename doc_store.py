@@ -0,0 +1,159 @@
+"""Process-wide, reference-counted store for converted document text.
+
+Documents are keyed by the SHA-256 of their text, so the same course pack
+uploaded by ten sessions is stored (and embedded) once. Text is kept
+compressed with zstd when the ``zstandard`` package is installed and zlib
+otherwise. Sessions only hold DocumentHandle objects; a handle's reference
+is released when it is released explicitly or garbage collected together
+with its session state.
+"""
+
+import hashlib
+import threading
+import weakref
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _compress(raw: bytes):
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=6).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def _decompress(codec: str, blob: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+class _Entry:
+    __slots__ = ("codec", "blob", "raw_size", "refs")
+
+    def __init__(self, codec, blob, raw_size):
+        self.codec = codec
+        self.blob = blob
+        self.raw_size = raw_size
+        self.refs = 0
+
+
+class DocumentHandle:
+    """A session's lightweight reference to one stored document."""
+
+    def __init__(self, store, content_hash: str, filename: str, is_new: bool):
+        self.store = store
+        self.content_hash = content_hash
+        self.filename = filename
+        # True when this handle caused the text to be stored (and so it
+        # still needs to be embedded)
+        self.is_new = is_new
+        self._finalizer = weakref.finalize(self, store._release, content_hash)
+
+    @property
+    def text(self) -> str:
+        return self.store.get_text(self.content_hash)
+
+    @property
+    def stored_size(self) -> int:
+        return self.store.stored_size(self.content_hash)
+
+    def release(self):
+        self._finalizer()
+
+
+class DocumentStore:
+    def __init__(self):
+        # Reentrant: a handle garbage collected while this thread holds the
+        # lock (e.g. during a drain_evicted delete) releases itself right away
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._evicted = []
+
+    # Store text (once per distinct content) and return a counted handle
+    def open(self, filename: str, text: str) -> DocumentHandle:
+        key = content_hash(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            is_new = entry is None
+            if is_new:
+                raw = text.encode("utf-8")
+                entry = _Entry(*_compress(raw), len(raw))
+                self._entries[key] = entry
+                if key in self._evicted:
+                    # dropped but not yet cleaned up elsewhere; its chunks still exist
+                    self._evicted.remove(key)
+                    is_new = False
+            entry.refs += 1
+        return DocumentHandle(self, key, filename, is_new)
+
+    def _release(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs <= 0:
+                del self._entries[key]
+                self._evicted.append(key)
+
+    # Call delete(hash) for each document whose last reference went away, so
+    # the caller can drop its embeddings. Runs under the store lock: a session
+    # re-opening the same content waits until the delete is done and then
+    # re-embeds it, instead of its chunks being wiped by a delete in flight.
+    # delete must not call back into the store.
+    def drain_evicted(self, delete):
+        with self._lock:
+            evicted, self._evicted = self._evicted, []
+            for key in evicted:
+                if key not in self._entries:
+                    delete(key)
+        return evicted
+
+    def get_text(self, key: str) -> str:
+        with self._lock:
+            entry = self._entries[key]
+        return _decompress(entry.codec, entry.blob).decode("utf-8")
+
+    def stored_size(self, key: str) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+            return len(entry.blob) if entry else 0
+
+    # Totals across every session in this process
+    def memory_report(self) -> dict:
+        with self._lock:
+            entries = list(self._entries.values())
+        raw = sum(e.raw_size for e in entries)
+        stored = sum(len(e.blob) for e in entries)
+        return {
+            "documents": len(entries),
+            "references": sum(e.refs for e in entries),
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "compression_ratio": raw / stored if stored else 0.0,
+        }
+
+    # Memory attributable to one session: what it references, and its fair
+    # share when the same document is held by several sessions
+    def session_report(self, handles) -> dict:
+        referenced, share = 0, 0.0
+        with self._lock:
+            for key in {h.content_hash for h in handles}:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                referenced += len(entry.blob)
+                share += len(entry.blob) / max(entry.refs, 1)
+        return {
+            "documents": len(handles),
+            "referenced_bytes": referenced,
+            "shared_bytes": int(share),
+        }
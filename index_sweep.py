@@ -0,0 +1,168 @@
+"""Sweep vector index settings over a folder of notes.
+
+Chunks every .md/.txt file under NOTES_DIR the same way day1.py does, embeds
+the chunks once, then for every combination of the given settings builds a
+fresh ChromaDB collection and reports memory, build time, query latency and
+recall@k against exact search on the full 384-dim vectors.
+
+Usage:
+    python index_sweep.py NOTES_DIR --M 8 16 32 --ef-search 10 50 --dims 0 128 64 --float16 off on
+    python index_sweep.py output_markdown --questions questions.txt --out sweep.jsonl
+
+The markdown folder written by convert_cli.py works as NOTES_DIR.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import chromadb
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from chunking import split_into_chunks
+from vector_index import IndexConfig
+
+
+BATCH_SIZE = 1000
+
+
+def load_chunks(notes_dir: Path):
+    chunks = []
+    for path in sorted(notes_dir.rglob("*")):
+        if path.is_file() and path.suffix.lower() in (".md", ".txt"):
+            chunks.extend(split_into_chunks(path.read_text(encoding="utf-8", errors="replace")))
+    return chunks
+
+
+# Resident memory of this process in bytes (Linux only, else None)
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+# Exact top-k ids for each query on the full-precision vectors
+def exact_top_k(vectors, queries, k: int, space: str):
+    if space == "l2":
+        # |q - v|^2 without materialising every difference vector
+        scores = (vectors ** 2).sum(axis=1)[None, :] - 2 * (queries @ vectors.T)
+    else:
+        # cosine and ip agree on the normalized MiniLM vectors
+        scores = -(queries @ vectors.T)
+    return np.argsort(scores, axis=1)[:, :k]
+
+
+def run_config(config: IndexConfig, vectors, queries, truth, k: int) -> dict:
+    client = chromadb.EphemeralClient()
+    name = f"sweep_{time.time_ns()}"
+    rss_before = rss_bytes()
+
+    started = time.perf_counter()
+    collection = client.create_collection(name=name, metadata=config.collection_metadata())
+    stored = config.transform(vectors)
+    for start in range(0, len(stored), BATCH_SIZE):
+        batch = stored[start:start + BATCH_SIZE]
+        collection.add(
+            embeddings=batch.tolist(),
+            ids=[str(i) for i in range(start, start + len(batch))]
+        )
+    build_seconds = time.perf_counter() - started
+    rss_after = rss_bytes()
+
+    latencies, hits = [], 0
+    for query, expected in zip(config.transform(queries), truth):
+        started = time.perf_counter()
+        results = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len({int(i) for i in results["ids"][0]} & set(expected.tolist()))
+
+    client.delete_collection(name=name)
+    return {
+        "config": config.label,
+        "space": config.space,
+        "M": config.M,
+        "ef_construction": config.ef_construction,
+        "ef_search": config.ef_search,
+        "dims": config.stored_dims,
+        "float16": config.float16,
+        "chunks": len(vectors),
+        "estimated_index_bytes": config.estimated_bytes(len(vectors)),
+        "rss_delta_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        "build_seconds": round(build_seconds, 3),
+        "query_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+        "query_ms_p95": round(float(np.percentile(latencies, 95)), 3),
+        f"recall_at_{k}": round(hits / (len(truth) * k), 4),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare vector index settings on your notes.")
+    parser.add_argument("notes", type=Path, help="folder of .md/.txt files to index")
+    parser.add_argument("--space", nargs="+", default=["l2"], choices=["l2", "cosine", "ip"])
+    parser.add_argument("--M", nargs="+", type=int, default=[16])
+    parser.add_argument("--ef-construction", nargs="+", type=int, default=[100])
+    parser.add_argument("--ef-search", nargs="+", type=int, default=[100])
+    parser.add_argument("--dims", nargs="+", type=int, default=[0],
+                        help="stored dimensions, 0 keeps the full 384")
+    parser.add_argument("--float16", nargs="+", choices=["off", "on"], default=["off"])
+    parser.add_argument("--questions", type=Path, default=None,
+                        help="file with one query per line (default: hold out sampled chunks as queries)")
+    parser.add_argument("--queries", type=int, default=100, help="number of chunks to hold out as queries (at most half)")
+    parser.add_argument("--k", type=int, default=3, help="results per query, as in the app")
+    parser.add_argument("--out", type=Path, default=None, help="also write results as JSON lines")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    chunks = load_chunks(args.notes)
+    if len(chunks) <= 2 * args.k:
+        print(f"Need more than {2 * args.k} chunks, found {len(chunks)} in {args.notes}", file=sys.stderr)
+        return 2
+
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+    print(f"Embedding {len(chunks)} chunks...")
+    vectors = model.encode(chunks, batch_size=64, convert_to_numpy=True).astype(np.float32)
+
+    if args.questions:
+        questions = [q.strip() for q in args.questions.read_text(encoding="utf-8").splitlines() if q.strip()]
+        queries = model.encode(questions, convert_to_numpy=True).astype(np.float32)
+    else:
+        # Hold the sampled chunks out of the index; otherwise each query finds
+        # its own vector as a trivial top-1 hit and recall looks better than it is
+        rng = np.random.default_rng(0)
+        picked = rng.choice(len(chunks), size=min(args.queries, len(chunks) // 2), replace=False)
+        held_out = np.zeros(len(chunks), dtype=bool)
+        held_out[picked] = True
+        queries = vectors[held_out]
+        vectors = vectors[~held_out]
+
+    truth = {space: exact_top_k(vectors, queries, args.k, space) for space in args.space}
+
+    results = []
+    grid = itertools.product(args.space, args.M, args.ef_construction, args.ef_search, args.dims, args.float16)
+    for space, M, ef_construction, ef_search, dims, float16 in grid:
+        config = IndexConfig(space=space, M=M, ef_construction=ef_construction, ef_search=ef_search,
+                             dims=dims or None, float16=float16 == "on")
+        result = run_config(config, vectors, queries, truth[space], args.k)
+        results.append(result)
+        print(f"{result['config']:<45} est {result['estimated_index_bytes'] / 2**20:7.1f} MiB  "
+              f"build {result['build_seconds']:7.2f} s  p50 {result['query_ms_p50']:6.2f} ms  "
+              f"p95 {result['query_ms_p95']:6.2f} ms  recall@{args.k} {result[f'recall_at_{args.k}']:.3f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Scoped temp files for uploads that docling cannot read from memory.
+
+Every temp file created here carries TEMP_PREFIX, is removed as soon as the
+caller is done with it, and is counted in temp_bytes_in_flight() while it
+exists. sweep_orphaned_temp_files() removes anything a crashed process left
+behind.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+TEMP_PREFIX = "docconv_"
+
+_lock = threading.Lock()
+_bytes_in_flight = 0
+_last_sweep = 0.0
+
+
+def _track(delta: int):
+    global _bytes_in_flight
+    with _lock:
+        _bytes_in_flight += delta
+
+
+# Bytes currently sitting in temp files created by this process
+def temp_bytes_in_flight() -> int:
+    with _lock:
+        return _bytes_in_flight
+
+
+# Write data to a temp file, yield its path, and always delete it afterwards
+@contextmanager
+def scoped_temp_file(data: bytes, suffix: str = ""):
+    with tempfile.NamedTemporaryFile(delete=False, prefix=TEMP_PREFIX, suffix=suffix) as tmp:
+        tmp_path = tmp.name
+    size = len(data)
+    _track(size)
+    try:
+        Path(tmp_path).write_bytes(data)
+        yield tmp_path
+    finally:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        _track(-size)
+
+
+# Remove our temp files older than max_age seconds. Runs at most once per
+# min_interval seconds so it is cheap to call on every Streamlit rerun.
+# Returns (files removed, bytes freed).
+def sweep_orphaned_temp_files(max_age: float = 3600, min_interval: float = 600):
+    global _last_sweep
+    now = time.time()
+    with _lock:
+        if now - _last_sweep < min_interval:
+            return 0, 0
+        _last_sweep = now
+
+    removed, freed = 0, 0
+    for path in Path(tempfile.gettempdir()).glob(f"{TEMP_PREFIX}*"):
+        try:
+            stat = path.stat()
+            if path.is_file() and now - stat.st_mtime > max_age:
+                path.unlink()
+                removed += 1
+                freed += stat.st_size
+        except OSError:
+            # vanished or owned by someone else
+            continue
+    return removed, freed
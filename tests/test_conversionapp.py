@@ -0,0 +1,30 @@
+import os
+import zipfile
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("docling")
+
+from conversionapp import build_zip_archive, unique_output_name
+from temp_uploads import TEMP_PREFIX
+
+
+def test_unique_output_name_keeps_names_apart():
+    taken = []
+    for upload in ("a.pdf", "a.docx", "a.DOCX", "b.txt"):
+        taken.append(unique_output_name(upload, taken))
+    assert taken == ["a.md", "a_docx.md", "a_docx_2.md", "b.md"]
+
+
+def test_build_zip_archive_holds_written_files(tmp_path):
+    (tmp_path / "a.md").write_text("# a")
+    (tmp_path / "b.md").write_text("# b")
+    archive_path = build_zip_archive(tmp_path, ["a.md", "b.md", "missing.md"])
+    try:
+        assert os.path.basename(archive_path).startswith(TEMP_PREFIX)
+        with zipfile.ZipFile(archive_path) as zf:
+            assert sorted(zf.namelist()) == ["a.md", "b.md"]
+            assert zf.read("b.md") == b"# b"
+    finally:
+        os.remove(archive_path)
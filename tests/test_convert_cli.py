@@ -0,0 +1,81 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("docling")
+
+import convert_cli
+from convert_cli import is_up_to_date, output_path_for
+
+
+def test_output_path_mirrors_source_tree():
+    source = Path("in/course/week1/notes.PDF")
+    assert output_path_for(Path("in"), Path("out"), source) == Path("out/course/week1/notes.md")
+
+
+def test_is_up_to_date(tmp_path):
+    source = tmp_path / "a.pdf"
+    target = tmp_path / "a.md"
+    source.write_bytes(b"%PDF")
+    assert not is_up_to_date(source, target)
+    target.write_text("# a")
+    os.utime(source, (1000, 1000))
+    os.utime(target, (2000, 2000))
+    assert is_up_to_date(source, target)
+    os.utime(source, (3000, 3000))
+    assert not is_up_to_date(source, target)
+
+
+# Stands in for run_pool: converts jobs in order until it reaches one whose
+# source is in crash_on, then returns it and everything after it as unfinished
+def fake_pool(crash_on, calls):
+    def run_pool(jobs, workers, num_threads, report):
+        calls.append(([Path(source).name for source, _ in jobs], workers))
+        for i, (source, target) in enumerate(jobs):
+            if Path(source).name in crash_on:
+                return jobs[i:]
+            report({"event": "converted", "source": source, "output": target})
+        return []
+    return run_pool
+
+
+def read_log(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_colliding_outputs_are_reported_as_failed(tmp_path, monkeypatch):
+    (tmp_path / "in").mkdir()
+    (tmp_path / "in/notes.docx").write_bytes(b"docx")
+    (tmp_path / "in/notes.pdf").write_bytes(b"%PDF")
+    monkeypatch.setattr(convert_cli, "run_pool", fake_pool(set(), []))
+
+    assert convert_cli.main([str(tmp_path / "in"), str(tmp_path / "out")]) == 1
+    log = read_log(tmp_path / "out/conversion_log.jsonl")
+    failed = [r for r in log if r["event"] == "failed"]
+    assert [Path(r["source"]).name for r in failed] == ["notes.pdf"]
+    assert "already produced by" in failed[0]["error"]
+    assert log[-1]["converted"] == 1
+
+
+def test_crash_isolates_running_jobs_and_resubmits_the_rest(tmp_path, monkeypatch):
+    (tmp_path / "in").mkdir()
+    for name in "abcdef":
+        (tmp_path / f"in/{name}.txt").write_text(name)
+    calls = []
+    monkeypatch.setattr(convert_cli, "run_pool", fake_pool({"c.txt"}, calls))
+
+    assert convert_cli.main([str(tmp_path / "in"), str(tmp_path / "out"), "--workers", "2"]) == 1
+    assert calls == [
+        (["a.txt", "b.txt", "c.txt", "d.txt", "e.txt", "f.txt"], 2),
+        # c and d may have been running: each is retried alone
+        (["c.txt"], 1),
+        (["d.txt"], 1),
+        # e and f never started and go back to a full-size pool
+        (["e.txt", "f.txt"], 2),
+    ]
+    log = read_log(tmp_path / "out/conversion_log.jsonl")
+    failed = [r for r in log if r["event"] == "failed"]
+    assert [(Path(r["source"]).name, r["error"]) for r in failed] == [("c.txt", "worker process died")]
+    assert log[-1]["converted"] == 5
@@ -0,0 +1,53 @@
+from datetime import date
+
+from doc_index import DocumentIndex
+from doc_store import DocumentStore
+
+
+def make_index(*docs):
+    store = DocumentStore()
+    index = DocumentIndex()
+    for filename, words, pages in docs:
+        index.add(store.open(filename, filename * 10), word_count=words, chunk_count=words // 10,
+                  size_bytes=words * 6, page_count=pages)
+    return index
+
+
+def test_running_totals_follow_add_and_remove():
+    index = make_index(("b.pdf", 100, 3), ("a.txt", 50, None), ("c.pdf", 30, 2))
+    assert len(index) == 3
+    assert (index.total_words, index.total_chunks, index.total_pages) == (180, 18, 5)
+    assert index.file_types == {".pdf": 2, ".txt": 1}
+
+    removed = index.remove(1)
+    assert removed["filename"] == "a.txt"
+    assert index.total_words == 130
+    assert index.file_types == {".pdf": 2}
+
+
+def test_page_sorts_and_slices():
+    index = make_index(("b.pdf", 100, 3), ("a.txt", 50, None), ("c.pdf", 30, 2))
+    assert [r["filename"] for r in index.page("Name")] == ["a.txt", "b.pdf", "c.pdf"]
+    assert [r["filename"] for r in index.page("Words", descending=True, page=0, page_size=2)] == ["b.pdf", "a.txt"]
+    assert [r["filename"] for r in index.page("Words", descending=True, page=1, page_size=2)] == ["c.pdf"]
+    assert index.num_pages(2) == 2
+
+
+def test_sorted_page_cache_is_invalidated_on_change():
+    index = make_index(("b.pdf", 100, 3))
+    assert [r["filename"] for r in index.page("Name")] == ["b.pdf"]
+    index.add(DocumentStore().open("a.txt", "x"), word_count=1, chunk_count=1, size_bytes=1)
+    assert [r["filename"] for r in index.page("Name")] == ["a.txt", "b.pdf"]
+
+
+def test_num_pages_is_at_least_one():
+    assert DocumentIndex().num_pages(20) == 1
+
+
+def test_select_combines_filters():
+    index = make_index(("b.pdf", 100, 3), ("a.txt", 50, None), ("c.pdf", 30, 2))
+    today = date.today()
+    assert {r["filename"] for r in index.select(file_types=[".pdf"])} == {"b.pdf", "c.pdf"}
+    assert [r["filename"] for r in index.select(filenames=["c.pdf"], file_types=[".pdf"])] == ["c.pdf"]
+    assert len(index.select(dates=[today])) == 3
+    assert index.select(filenames=["a.txt"], file_types=[".pdf"]) == []
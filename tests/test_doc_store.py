@@ -0,0 +1,92 @@
+import gc
+
+from doc_store import DocumentStore, content_hash
+
+
+TEXT = "Macronutrients are carbohydrates, proteins and fats. " * 50
+
+
+def test_open_deduplicates_by_content():
+    store = DocumentStore()
+    first = store.open("a.pdf", TEXT)
+    second = store.open("b.docx", TEXT)
+
+    assert first.is_new and not second.is_new
+    assert first.content_hash == second.content_hash == content_hash(TEXT)
+    assert (first.filename, second.filename) == ("a.pdf", "b.docx")
+    report = store.memory_report()
+    assert report["documents"] == 1
+    assert report["references"] == 2
+    assert report["stored_bytes"] < report["raw_bytes"]
+
+
+def test_text_round_trips_through_compression():
+    store = DocumentStore()
+    handle = store.open("notes.txt", "Vitamin C: 90 mg/day ✨")
+    assert handle.text == "Vitamin C: 90 mg/day ✨"
+
+
+def test_release_evicts_only_after_last_reference():
+    store = DocumentStore()
+    first = store.open("a.txt", TEXT)
+    second = store.open("b.txt", TEXT)
+    deleted = []
+
+    first.release()
+    store.drain_evicted(deleted.append)
+    assert deleted == []
+
+    second.release()
+    store.drain_evicted(deleted.append)
+    assert deleted == [content_hash(TEXT)]
+    assert store.memory_report()["documents"] == 0
+
+
+def test_release_is_idempotent():
+    store = DocumentStore()
+    keep = store.open("a.txt", TEXT)
+    dropped = store.open("b.txt", TEXT)
+    dropped.release()
+    dropped.release()
+    assert store.memory_report()["references"] == 1
+    assert keep.text == TEXT
+
+
+def test_garbage_collected_handle_releases_its_reference():
+    store = DocumentStore()
+    handle = store.open("a.txt", TEXT)
+    del handle
+    gc.collect()
+    deleted = []
+    store.drain_evicted(deleted.append)
+    assert deleted == [content_hash(TEXT)]
+
+
+def test_reopen_before_drain_keeps_existing_chunks():
+    store = DocumentStore()
+    store.open("a.txt", TEXT).release()
+    reopened = store.open("a.txt", TEXT)
+    deleted = []
+    store.drain_evicted(deleted.append)
+
+    # the chunks were never deleted, so they must not be embedded again
+    assert not reopened.is_new
+    assert deleted == []
+
+
+def test_reopen_after_drain_is_new_again():
+    store = DocumentStore()
+    store.open("a.txt", TEXT).release()
+    store.drain_evicted(lambda key: None)
+    assert store.open("a.txt", TEXT).is_new
+
+
+def test_session_report_splits_shared_documents():
+    store = DocumentStore()
+    mine = store.open("a.txt", TEXT)
+    theirs = store.open("a.txt", TEXT)
+    report = store.session_report([mine])
+    assert report["documents"] == 1
+    assert report["referenced_bytes"] == mine.stored_size
+    assert report["shared_bytes"] == mine.stored_size // 2
+    assert theirs.content_hash == mine.content_hash
@@ -0,0 +1,38 @@
+from datetime import date
+
+import pytest
+
+for module in ("streamlit", "chromadb", "transformers", "sentence_transformers", "docling"):
+    pytest.importorskip(module)
+
+from day1 import build_scope_filter
+from doc_index import DocumentIndex
+from doc_store import DocumentStore
+
+
+@pytest.fixture
+def index():
+    store = DocumentStore()
+    index = DocumentIndex()
+    for filename, text in (("a.pdf", "alpha"), ("b.txt", "beta"), ("c.pdf", "gamma")):
+        index.add(store.open(filename, text), word_count=1, chunk_count=1, size_bytes=5)
+    return index
+
+
+def hashes(index, *filenames):
+    return sorted(h.content_hash for h in index.handles() if h.filename in filenames)
+
+
+def test_no_scope_covers_every_session_document(index):
+    assert build_scope_filter(index) == {"content_hash": {"$in": hashes(index, "a.pdf", "b.txt", "c.pdf")}}
+
+
+def test_scope_narrows_by_filename_and_type(index):
+    assert build_scope_filter(index, file_types=[".pdf"]) == {"content_hash": {"$in": hashes(index, "a.pdf", "c.pdf")}}
+    assert build_scope_filter(index, filenames=["b.txt"], file_types=[".txt"]) == {
+        "content_hash": {"$in": hashes(index, "b.txt")}}
+
+
+def test_empty_scope_returns_none(index):
+    assert build_scope_filter(index, filenames=["a.pdf"], file_types=[".txt"]) is None
+    assert build_scope_filter(index, dates=[date(2000, 1, 1)]) is None
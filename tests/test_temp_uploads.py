@@ -0,0 +1,53 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+import temp_uploads
+from temp_uploads import TEMP_PREFIX, scoped_temp_file, sweep_orphaned_temp_files, temp_bytes_in_flight
+
+
+def test_scoped_temp_file_is_counted_and_removed():
+    before = temp_bytes_in_flight()
+    with scoped_temp_file(b"hello", suffix=".doc") as path:
+        assert Path(path).read_bytes() == b"hello"
+        assert Path(path).name.startswith(TEMP_PREFIX)
+        assert temp_bytes_in_flight() == before + 5
+    assert not os.path.exists(path)
+    assert temp_bytes_in_flight() == before
+
+
+def test_scoped_temp_file_is_removed_on_error():
+    before = temp_bytes_in_flight()
+    with pytest.raises(RuntimeError):
+        with scoped_temp_file(b"data") as path:
+            raise RuntimeError("conversion failed")
+    assert not os.path.exists(path)
+    assert temp_bytes_in_flight() == before
+
+
+def test_sweep_removes_only_old_prefixed_files(monkeypatch):
+    monkeypatch.setattr(temp_uploads, "_last_sweep", 0.0)
+    old = tempfile.NamedTemporaryFile(delete=False, prefix=TEMP_PREFIX)
+    old.write(b"1234")
+    old.close()
+    fresh = tempfile.NamedTemporaryFile(delete=False, prefix=TEMP_PREFIX)
+    fresh.close()
+    past = time.time() - 7200
+    os.utime(old.name, (past, past))
+    try:
+        removed, freed = sweep_orphaned_temp_files(max_age=3600, min_interval=0)
+        assert removed >= 1 and freed >= 4
+        assert not os.path.exists(old.name)
+        assert os.path.exists(fresh.name)
+    finally:
+        for name in (old.name, fresh.name):
+            if os.path.exists(name):
+                os.remove(name)
+
+
+def test_sweep_is_throttled(monkeypatch):
+    monkeypatch.setattr(temp_uploads, "_last_sweep", time.time())
+    assert sweep_orphaned_temp_files(min_interval=600) == (0, 0)
@@ -0,0 +1,69 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from vector_index import MODEL_DIMS, IndexConfig
+
+
+def test_collection_metadata_uses_chroma_keys():
+    config = IndexConfig(space="cosine", M=32, ef_construction=200, ef_search=64)
+    assert config.collection_metadata() == {
+        "hnsw:space": "cosine",
+        "hnsw:M": 32,
+        "hnsw:construction_ef": 200,
+        "hnsw:search_ef": 64,
+    }
+
+
+def test_invalid_settings_are_rejected():
+    with pytest.raises(ValueError):
+        IndexConfig(space="manhattan")
+    with pytest.raises(ValueError):
+        IndexConfig(dims=MODEL_DIMS + 1)
+
+
+def test_full_precision_transform_is_identity():
+    vectors = np.random.default_rng(1).standard_normal((4, MODEL_DIMS)).astype(np.float32)
+    assert np.array_equal(IndexConfig().transform(vectors), vectors)
+
+
+def test_projection_is_deterministic_and_reduces_dims():
+    vectors = np.random.default_rng(1).standard_normal((4, MODEL_DIMS))
+    first = IndexConfig(dims=64).transform(vectors)
+    second = IndexConfig(dims=64).transform(vectors)
+    assert first.shape == (4, 64)
+    assert np.array_equal(first, second)
+    assert IndexConfig(dims=64).transform(vectors[0]).shape == (64,)
+
+
+def test_float16_rounds_but_keeps_float32():
+    vectors = np.array([[0.1234567] * MODEL_DIMS], dtype=np.float32)
+    out = IndexConfig(float16=True).transform(vectors)
+    assert out.dtype == np.float32
+    assert np.allclose(out, vectors, atol=1e-3)
+    assert not np.array_equal(out, vectors)
+
+
+def test_relevance_cutoff_matches_original_l2_threshold():
+    assert IndexConfig(space="l2").max_relevant_distance() == pytest.approx(1.5)
+    assert IndexConfig(space="cosine").max_relevant_distance() == pytest.approx(0.75)
+    assert IndexConfig(space="ip").max_relevant_distance() == pytest.approx(0.75)
+
+
+def test_config_round_trips_through_collection_metadata():
+    config = IndexConfig(space="cosine", M=32, ef_construction=200, ef_search=64, dims=64, float16=True, seed=7)
+    rebuilt = IndexConfig.from_metadata(config.collection_metadata())
+    assert rebuilt.label == config.label
+    assert (rebuilt.dims, rebuilt.float16, rebuilt.seed) == (64, True, 7)
+    vectors = np.random.default_rng(1).standard_normal((2, MODEL_DIMS))
+    assert np.array_equal(rebuilt.transform(vectors), config.transform(vectors))
+
+
+def test_metadata_values_are_chroma_compatible():
+    for value in IndexConfig().collection_metadata().values():
+        assert isinstance(value, (str, int, float, bool))
+
+
+def test_missing_metadata_means_chroma_defaults_and_full_vectors():
+    config = IndexConfig.from_metadata(None)
+    assert (config.space, config.ef_search, config.dims, config.float16) == ("l2", 10, None, False)
@@ -0,0 +1,113 @@
+"""Vector index settings for ChromaDB collections.
+
+IndexConfig bundles the HNSW parameters ChromaDB accepts as collection
+metadata with an optional transform applied to every embedding before it is
+stored or queried:
+
+* dims: project the 384-dim all-MiniLM-L6-v2 vectors down to fewer
+  dimensions with a fixed random (Johnson-Lindenstrauss) projection. It needs
+  no training data, so documents can still be added one at a time.
+* float16: round vectors to half precision. ChromaDB keeps float32
+  internally, so this does not shrink its index; it exists so the recall cost
+  of half-precision storage can be measured (see index_sweep.py).
+
+Documents and queries must go through the same config, so a collection's
+config is fixed when it is created and written into its metadata;
+IndexConfig.from_metadata rebuilds it from there.
+
+ef_search defaults to 100 rather than hnswlib's 10: the app always searches
+with a restrictive metadata filter, and a small ef can then return fewer than
+k results (some ChromaDB versions fail with "Cannot return the results in a
+contiguous 2D array").
+"""
+
+import numpy as np
+
+
+MODEL_DIMS = 384
+
+# Cosine similarity below which a chunk is treated as unrelated to the
+# question. 0.25 is the app's original cutoff of 1.5 in squared l2 distance.
+MIN_SIMILARITY = 0.25
+
+
+class IndexConfig:
+    def __init__(self, space: str = "l2", M: int = 16, ef_construction: int = 100, ef_search: int = 100,
+                 dims: int = None, float16: bool = False, seed: int = 0):
+        if space not in ("l2", "cosine", "ip"):
+            raise ValueError(f"Unsupported space: {space}")
+        if dims is not None and not 0 < dims <= MODEL_DIMS:
+            raise ValueError(f"dims must be between 1 and {MODEL_DIMS}, got {dims}")
+        self.space = space
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.dims = dims
+        self.float16 = float16
+        self.seed = seed
+        self._projection = None
+
+    @property
+    def stored_dims(self) -> int:
+        return self.dims or MODEL_DIMS
+
+    @property
+    def label(self) -> str:
+        vectors = f"{self.stored_dims}d" + (" fp16" if self.float16 else "")
+        return f"{self.space} M={self.M} efC={self.ef_construction} efS={self.ef_search} {vectors}"
+
+    # Collection metadata: the hnsw:* keys ChromaDB's index understands, plus
+    # the vector transform under index:* so queries can reproduce it
+    def collection_metadata(self) -> dict:
+        return {
+            "hnsw:space": self.space,
+            "hnsw:M": self.M,
+            "hnsw:construction_ef": self.ef_construction,
+            "hnsw:search_ef": self.ef_search,
+            # ChromaDB metadata cannot hold None, 0 means the full model dims
+            "index:dims": self.dims or 0,
+            "index:float16": self.float16,
+            "index:seed": self.seed,
+        }
+
+    # Rebuild the config a collection was created with. Missing keys fall
+    # back to ChromaDB's own defaults and untransformed vectors.
+    @classmethod
+    def from_metadata(cls, metadata) -> "IndexConfig":
+        metadata = metadata or {}
+        return cls(
+            space=metadata.get("hnsw:space", "l2"),
+            M=metadata.get("hnsw:M", 16),
+            ef_construction=metadata.get("hnsw:construction_ef", 100),
+            ef_search=metadata.get("hnsw:search_ef", 10),
+            dims=metadata.get("index:dims") or None,
+            float16=bool(metadata.get("index:float16", False)),
+            seed=metadata.get("index:seed", 0),
+        )
+
+    def _get_projection(self):
+        if self._projection is None:
+            rng = np.random.default_rng(self.seed)
+            self._projection = rng.standard_normal((MODEL_DIMS, self.dims)).astype(np.float32) / np.sqrt(self.dims)
+        return self._projection
+
+    # Map model embeddings (n x 384, or a single vector) to stored vectors
+    def transform(self, embeddings) -> np.ndarray:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if self.dims:
+            vectors = vectors @ self._get_projection()
+        if self.float16:
+            vectors = vectors.astype(np.float16).astype(np.float32)
+        return vectors
+
+    # MIN_SIMILARITY as a distance in this config's space. ChromaDB reports
+    # squared l2, 1 - cosine, or 1 - dot product; on the normalized MiniLM
+    # vectors these all follow from the cosine similarity.
+    def max_relevant_distance(self) -> float:
+        if self.space == "l2":
+            return 2 - 2 * MIN_SIMILARITY
+        return 1 - MIN_SIMILARITY
+
+    # Rough index size: stored float32 vectors plus HNSW level-0 links
+    def estimated_bytes(self, count: int) -> int:
+        return count * (self.stored_dims * 4 + self.M * 2 * 4)